@@ -1,8 +1,12 @@
 import streamlit as st
 from elasticsearch import Elasticsearch
 import json
+import os
+import sys
 import time
-from itertools import permutations
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from query_builder import build_query
 
 # -------------------------------
 # Elasticsearch connection setup
@@ -47,45 +51,10 @@ def search_debtor(name=None, address=None):
     if not name and not address:
         return [], "No query provided." # Return tuple for error handling
 
-    query_clauses = []
-    NAME_FIELD = "debtor_name"
-    ADDRESS_FIELD = "debtor_address"
-    if name:
-        name_parts = name.strip().split()
-        if len(name_parts) > 1:
-            # Generate permutations
-            name_permutations = set([" ".join(p) for p in permutations(name_parts)])
-            permutation_clauses = [
-                {"match_phrase": {NAME_FIELD: name_variant}} for name_variant in name_permutations
-            ]
-            # Create an OR (bool/should) query for all permutations
-            name_query = {
-                "bool": {
-                    "should": permutation_clauses,
-                    "minimum_should_match": 1
-                }
-            }
-            query_clauses.append(name_query)
-        else:
-            query_clauses.append({"match": {NAME_FIELD: name}})
-
-    if address:
-        if ' ' in address.strip():
-            # Multi-word address: use 'match_phrase'
-            query_clauses.append({"match_phrase": {ADDRESS_FIELD: address}})
-        else:
-            # Single word address: use 'match'
-            query_clauses.append({"match": {ADDRESS_FIELD: address}})
-
-    # --- Determine the final query structure ---
-    if len(query_clauses) == 0:
+    query = build_query(name=name, address=address)
+    if query is None:
         return [], "No query provided."
-    elif len(query_clauses) == 1:
-        # Only one field was searched
-        final_query_body = {"query": query_clauses[0]}
-    else:
-        # Both fields searched: use AND (bool/must)
-        final_query_body = {"query": {"bool": {"must": query_clauses}}}
+    final_query_body = {"query": query}
 
     try:
         response = es.search(index=INDEX_NAME, body=final_query_body, size=50)
@@ -0,0 +1,401 @@
+import streamlit as st
+from elasticsearch import Elasticsearch
+from manticoresearch import Configuration, ApiClient, SearchApi, SearchRequest
+from manticoresearch.rest import ApiException
+import math
+import os
+import sys
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from query_builder import build_query
+
+# -------------------------------
+# Backend connection setup
+# -------------------------------
+ES_HOST = "http://localhost:9200"
+MANTICORE_HOST = "http://127.0.0.1:9308"
+INDEX_NAME = "data3"  # Same extract is indexed in both engines under this name
+
+SEARCH_SIZE = 50
+REQUEST_TIMEOUT = 2.0      # Seconds before a single backend request is given up on
+DEFAULT_HEDGE_DELAY = 0.1  # Seconds to wait before hedging until enough samples exist
+MIN_HEDGE_SAMPLES = 20     # Samples needed before the p95 hedge delay is trusted
+MIN_REPORT_SAMPLES = 100   # Samples needed before a p99 is reported (below 100 it is just the maximum)
+MAX_FAILURE_RATE = 0.05    # Above this failure rate the p95 is a failure, so hedge at once
+LATENCY_WINDOW = 1000      # Number of recent latencies kept per backend / mode
+MAX_WORKERS = 32           # Each search holds at most 2 workers, each for at most REQUEST_TIMEOUT
+
+ELASTIC = "Elasticsearch"
+MANTICORE = "Manticore"
+
+es = Elasticsearch(ES_HOST)
+config = Configuration(host=MANTICORE_HOST)
+
+
+# -------------------------------
+# Shared state (survives Streamlit reruns)
+# -------------------------------
+# Only call these from the script thread; worker threads get the objects passed in.
+@st.cache_resource
+def get_executor():
+    """Thread pool used to fan queries out to both backends."""
+    return ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="federated")
+
+
+@st.cache_resource
+def get_latency_log():
+    """Recent (latency in seconds, failed) samples per backend leg and per search mode."""
+    return {"lock": threading.Lock(), "samples": {}}
+
+
+def record_latency(log, key, elapsed, failed=False):
+    with log["lock"]:
+        log["samples"].setdefault(key, deque(maxlen=LATENCY_WINDOW)).append((elapsed, failed))
+
+
+def latency_samples(log, key):
+    with log["lock"]:
+        return list(log["samples"].get(key, []))
+
+
+def percentile(samples, pct):
+    """
+    Nearest-rank percentile; None when there are no samples. A failed sample
+    counts as at least REQUEST_TIMEOUT, so a fast refusal never looks like a
+    fast answer.
+    """
+    if not samples:
+        return None
+    ordered = sorted(max(elapsed, REQUEST_TIMEOUT) if failed else elapsed for elapsed, failed in samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def failure_count(samples):
+    return sum(1 for _, failed in samples if failed)
+
+
+def hedge_delay(log, backend):
+    """
+    Delay before the second backend is asked: the p95 latency of the first,
+    timed from submission so it matches the hedge timer. Failures and timeouts
+    count as samples; if more than MAX_FAILURE_RATE of them failed, the p95 is
+    a failure itself, so the second backend is asked straight away.
+    """
+    samples = latency_samples(log, backend)
+    if len(samples) < MIN_HEDGE_SAMPLES:
+        return DEFAULT_HEDGE_DELAY
+    if failure_count(samples) / len(samples) > MAX_FAILURE_RATE:
+        return 0.0
+    return percentile(samples, 95)
+
+
+# -------------------------------
+# Per-backend search functions
+# -------------------------------
+# These run in worker threads, so they must not call st.* directly.
+# Hits are normalised to {"_id", "_source", "_backend"} so they can be merged.
+def search_elastic(query):
+    response = es.options(request_timeout=REQUEST_TIMEOUT).search(
+        index=INDEX_NAME, body={"query": query}, size=SEARCH_SIZE
+    )
+    return [
+        {"_id": str(hit.get("_id")), "_source": hit.get("_source", {}), "_backend": ELASTIC}
+        for hit in response.get("hits", {}).get("hits", [])
+    ]
+
+
+def search_manticore(query):
+    search_request = SearchRequest(
+        table=INDEX_NAME,
+        query=query,
+        limit=SEARCH_SIZE,
+        _source=["*"]
+    )
+    with ApiClient(config) as client:
+        search_api = SearchApi(client)
+        response = search_api.search(search_request, _request_timeout=REQUEST_TIMEOUT)
+        return [
+            {"_id": str(hit.id), "_source": hit.source, "_backend": MANTICORE}
+            for hit in response.hits.hits
+        ]
+
+
+BACKENDS = {
+    ELASTIC: search_elastic,
+    MANTICORE: search_manticore,
+}
+
+
+def run_backend(backend, query, log, submitted_at, leg_key=None):
+    """
+    Runs one backend and returns (backend, results, error). The latency is
+    recorded for failures and timeouts too, and is timed from submission so
+    that time spent queued in the pool is included. With leg_key the latency
+    is also recorded under that key, even when the leg finishes after the
+    federated search has returned.
+    """
+    keys = [backend] + ([leg_key] if leg_key else [])
+    try:
+        results = BACKENDS[backend](query)
+    except ApiException as e:
+        for key in keys:
+            record_latency(log, key, time.time() - submitted_at, failed=True)
+        return backend, [], f"{backend} API Error: {e.reason}"
+    except Exception as e:
+        for key in keys:
+            record_latency(log, key, time.time() - submitted_at, failed=True)
+        return backend, [], f"{backend} API Error: {e}"
+    for key in keys:
+        record_latency(log, key, time.time() - submitted_at)
+    return backend, results, None
+
+
+def submit_backend(executor, backend, query, log, submitted_at=None, leg_key=None):
+    submitted_at = time.time() if submitted_at is None else submitted_at
+    return executor.submit(run_backend, backend, query, log, submitted_at, leg_key)
+
+
+def mode_key(mode, primary):
+    """Latency series key of a search mode with the given primary engine."""
+    return f"{mode} ({primary})"
+
+
+def primary_leg_key(mode, primary):
+    """
+    Latency series key of the primary leg of a federated search: what the
+    primary engine alone took on the same query at the same moment.
+    """
+    return f"{mode_key(mode, primary)} primary leg"
+
+
+# -------------------------------
+# Search modes
+# -------------------------------
+def single_search(query, backend, log):
+    """Sends the query to one backend only."""
+    future = submit_backend(get_executor(), backend, query, log)
+    _, results, error = future.result()
+    return results, error
+
+
+def hedged_search(query, primary, log, started_at, immediate=False):
+    """
+    Sends the query to the primary backend and, if it has not answered within
+    its p95 latency (or failed), to the other backend as well. The first
+    successful answer wins; a slower request that already started is left to
+    run into REQUEST_TIMEOUT, a queued secondary is cancelled. The primary leg
+    is never cancelled, as its latency (from started_at) is the baseline.
+    With immediate=True both backends are asked at once.
+    Returns (results, answered_by, hedged, error).
+    """
+    executor = get_executor()
+    secondary = MANTICORE if primary == ELASTIC else ELASTIC
+    mode = "Race" if immediate else "Hedged"
+
+    primary_future = submit_backend(
+        executor, primary, query, log, started_at, primary_leg_key(mode, primary)
+    )
+    pending = {primary_future}
+    if immediate:
+        pending.add(submit_backend(executor, secondary, query, log))
+        hedged = True
+    else:
+        done, _ = wait(pending, timeout=hedge_delay(log, primary))
+        hedged = False
+        if not done or next(iter(done)).result()[2] is not None:
+            pending.add(submit_backend(executor, secondary, query, log))
+            hedged = True
+
+    errors = []
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            backend, results, error = future.result()
+            if error is None:
+                for loser in pending - {primary_future}:
+                    loser.cancel()
+                return results, backend, hedged, None
+            errors.append(error)
+    return [], None, hedged, " | ".join(errors)
+
+
+def union_search(query, primary, log, started_at):
+    """
+    Sends the query to both backends concurrently and merges the hits,
+    de-duplicated by document id. Documents are ordered by their best rank in
+    either backend, and each one lists the backends that returned it.
+    The primary leg's latency (from started_at) is recorded as the baseline.
+    Returns (results, answered_by, error).
+    """
+    executor = get_executor()
+    futures = [
+        submit_backend(
+            executor, backend, query, log, started_at,
+            primary_leg_key("Union", primary) if backend == primary else None
+        )
+        for backend in BACKENDS
+    ]
+
+    answered = []
+    errors = []
+    ranked = {}
+    for future in futures:
+        backend, results, error = future.result()
+        if error:
+            errors.append(error)
+            continue
+        answered.append(backend)
+        for rank, hit in enumerate(results):
+            if hit["_id"] in ranked:
+                best_rank, merged = ranked[hit["_id"]]
+                merged["_backends"].append(backend)
+                ranked[hit["_id"]] = (min(best_rank, rank), merged)
+            else:
+                merged = {"_id": hit["_id"], "_source": hit["_source"], "_backends": [backend]}
+                ranked[hit["_id"]] = (rank, merged)
+
+    merged_hits = [merged for _, merged in sorted(ranked.values(), key=lambda item: item[0])]
+    return merged_hits, answered, " | ".join(errors) or None
+
+
+# -------------------------------
+# Streamlit UI
+# -------------------------------
+st.set_page_config(page_title="Federated Debtor Search", page_icon="💼", layout="centered")
+st.title("Federated Debtor Search (Elasticsearch + Manticore)")
+st.markdown(f"Searching index **{INDEX_NAME}** on both engines")
+
+st.info(
+    """
+    **Search Logic:**
+    - Uses the same name/address query as the single-engine apps and sends it to **both** Elasticsearch and Manticore.
+    - **Single:** Asks only the primary engine.
+    - **Hedged:** Asks the primary engine first and the other one only if the primary has not answered within its p95 latency. The first complete answer wins.
+    - **Race:** Asks both engines at once and returns the first complete answer.
+    - **Union:** Waits for both engines and merges their hits, removing duplicates by document id.
+    - The p99 improvement compares each federated mode with what its primary engine alone took on the same searches.
+    - Fuzzy search is not federated, as Manticore does not support the `term~N` fuzzy syntax.
+    """
+)
+
+debtor_name = st.text_input("Enter Debtor Name", placeholder="e.g. JOHN DOE")
+debtor_address = st.text_input("Enter Debtor Address", placeholder="e.g. 1234 MAIN ST, TX")
+mode = st.radio("Search Mode", ["Single", "Hedged", "Race", "Union"], index=1, horizontal=True)
+primary_backend = st.radio("Primary Engine", [ELASTIC, MANTICORE], horizontal=True)
+search_button = st.button("Search 🔎")
+
+
+def show_latency_report(log):
+    """
+    Shows p50/p95/p99 and failures per search mode, per primary leg and per
+    backend, and the p99 gain of the selected mode over its own primary leg.
+    Modes and primary legs are timed from the same start, failures included.
+    """
+    rows = []
+    for primary in BACKENDS:
+        for m in ["Single", "Hedged", "Race", "Union"]:
+            keys = [mode_key(m, primary)]
+            if m != "Single":
+                keys.append(primary_leg_key(m, primary))
+            for key in keys:
+                rows.append((key, key))
+    rows += [(b, f"{b} (all requests)") for b in BACKENDS]
+
+    table = []
+    for key, label in rows:
+        samples = latency_samples(log, key)
+        if not samples:
+            continue
+        table.append({
+            "Source": label,
+            "Samples": len(samples),
+            "Failures": failure_count(samples),
+            "p50 (s)": round(percentile(samples, 50), 3),
+            "p95 (s)": round(percentile(samples, 95), 3),
+            "p99 (s)": round(percentile(samples, 99), 3),
+        })
+    if not table:
+        return
+
+    st.markdown("### Latency")
+    st.table(table)
+    st.caption(f"Failed requests count as at least {REQUEST_TIMEOUT:.1f}s in the percentiles.")
+
+    if mode == "Single":
+        return
+    baseline_key = primary_leg_key(mode, primary_backend)
+    selected_key = mode_key(mode, primary_backend)
+    baseline = latency_samples(log, baseline_key)
+    selected = latency_samples(log, selected_key)
+    if len(baseline) < MIN_REPORT_SAMPLES or len(selected) < MIN_REPORT_SAMPLES:
+        st.caption(
+            f"p99 improvement needs at least {MIN_REPORT_SAMPLES} searches in both "
+            f"{selected_key} ({len(selected)}) and {baseline_key} ({len(baseline)})."
+        )
+        return
+    baseline_p99 = percentile(baseline, 99)
+    selected_p99 = percentile(selected, 99)
+    improvement = (baseline_p99 - selected_p99) / baseline_p99 * 100 if baseline_p99 else 0.0
+    st.caption(
+        f"{selected_key} p99: {selected_p99:.3f}s vs {baseline_key} p99: {baseline_p99:.3f}s "
+        f"({improvement:+.1f}% improvement)"
+    )
+
+
+# -------------------------------
+# UI Logic
+# -------------------------------
+latency_log = get_latency_log()
+
+if search_button:
+    name_input = debtor_name.strip()
+    address_input = debtor_address.strip()
+
+    if not name_input and not address_input:
+        st.warning("Please enter at least a debtor name or address.")
+    else:
+        query = build_query(name=name_input or None, address=address_input or None)
+        with st.spinner(f"Searching ({mode} mode)..."):
+            start_time = time.time()
+            if mode == "Single":
+                results, error = single_search(query, primary_backend, latency_log)
+                answered_by = None if error else primary_backend
+                status = f"answered by **{answered_by}**"
+            elif mode == "Union":
+                results, answered, error = union_search(query, primary_backend, latency_log, start_time)
+                answered_by = " + ".join(answered)
+                status = f"merged from **{answered_by}**"
+            else:
+                results, answered_by, hedged, error = hedged_search(
+                    query, primary_backend, latency_log, start_time, immediate=(mode == "Race")
+                )
+                status = f"answered by **{answered_by}**"
+                if not hedged:
+                    status += " (no hedge request needed)"
+            elapsed_time = time.time() - start_time
+        record_latency(latency_log, mode_key(mode, primary_backend), elapsed_time, failed=not answered_by)
+
+        if not answered_by:
+            st.error(f"{error}")
+        else:
+            if error:
+                st.warning(f"{error}")
+            st.info(f"Search completed in {elapsed_time:.3f} seconds, {status}")
+
+            if not results:
+                st.error("No matching documents found.")
+            else:
+                st.success(f"Found {len(results)} matching document(s)")
+                for i, hit in enumerate(results, start=1):
+                    backends = hit.get("_backends", [hit.get("_backend")])
+                    st.markdown(f"### Result {i} (ID {hit['_id']}, from {', '.join(backends)})")
+                    st.json(hit["_source"], expanded=True)
+
+show_latency_report(latency_log)
+
+st.markdown("---")
@@ -2,8 +2,12 @@ import streamlit as st
 from manticoresearch import Configuration, ApiClient, SearchApi, SearchRequest
 from manticoresearch.rest import ApiException
 import json
+import os
+import sys
 import time
-from itertools import permutations
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from query_builder import build_query
 
 # -------------------------------
 # Manticore connection setup
@@ -64,39 +68,8 @@ def search_manticore(debtor_name="", address=""):
     if not debtor_name and not address:
         return [], "No query provided."
 
-    query_clauses = []
-
-    # --- UPDATED logic for Debtor Name with Permutations ---
-    if debtor_name:
-        name_parts = debtor_name.strip().split()
-        if len(name_parts) > 1:
-            name_permutations = set([" ".join(p) for p in permutations(name_parts)])
-            permutation_clauses = [
-                {"match_phrase": {"debtor_name": name_variant}} for name_variant in name_permutations
-            ]
-            name_query = {
-                "bool": {
-                    "should": permutation_clauses,
-                    "minimum_should_match": 1
-                }
-            }
-            query_clauses.append(name_query)
-        else:
-            query_clauses.append({"match": {"debtor_name": debtor_name}})
-
-    # --- Logic for Address ---
-    if address:
-        if ' ' in address.strip():
-            query_clauses.append({"match_phrase": {"debtor_address": address}})
-        else:
-            query_clauses.append({"match": {"debtor_address": address}})
-
-    # --- Determine the final query structure ---
-    if len(query_clauses) == 2:
-        final_query = {"bool": {"must": query_clauses}}
-    elif len(query_clauses) == 1:
-        final_query = query_clauses[0]
-    else:
+    final_query = build_query(name=debtor_name, address=address)
+    if final_query is None:
         return [], "No query provided."
 
     search_request = SearchRequest(
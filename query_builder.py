@@ -0,0 +1,59 @@
+from itertools import permutations
+
+# -------------------------------
+# Shared debtor query builder
+# -------------------------------
+# Used by Elastic_Search/search_elastic.py, Manticore_Search/search_manticore.py
+# and Federated_Search/search_federated.py. Both engines accept the same JSON
+# query DSL, so the same query is sent to either of them.
+NAME_FIELD = "debtor_name"
+ADDRESS_FIELD = "debtor_address"
+
+
+def build_query(name=None, address=None):
+    """
+    Builds the debtor search query:
+    - For multi-word names, it generates all permutations and performs an OR search.
+    - Uses 'match_phrase' for multi-word address queries.
+    - Uses 'match' for single-word queries.
+    - Combines name and address with an AND condition.
+    Returns None when neither name nor address is given.
+    """
+    query_clauses = []
+
+    if name:
+        name_parts = name.strip().split()
+        if len(name_parts) > 1:
+            # Generate permutations
+            name_permutations = set([" ".join(p) for p in permutations(name_parts)])
+            permutation_clauses = [
+                {"match_phrase": {NAME_FIELD: name_variant}} for name_variant in name_permutations
+            ]
+            # Create an OR (bool/should) query for all permutations
+            name_query = {
+                "bool": {
+                    "should": permutation_clauses,
+                    "minimum_should_match": 1
+                }
+            }
+            query_clauses.append(name_query)
+        else:
+            query_clauses.append({"match": {NAME_FIELD: name}})
+
+    if address:
+        if ' ' in address.strip():
+            # Multi-word address: use 'match_phrase'
+            query_clauses.append({"match_phrase": {ADDRESS_FIELD: address}})
+        else:
+            # Single word address: use 'match'
+            query_clauses.append({"match": {ADDRESS_FIELD: address}})
+
+    # --- Determine the final query structure ---
+    if len(query_clauses) == 0:
+        return None
+    elif len(query_clauses) == 1:
+        # Only one field was searched
+        return query_clauses[0]
+    else:
+        # Both fields searched: use AND (bool/must)
+        return {"bool": {"must": query_clauses}}